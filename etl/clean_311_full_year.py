@@ -1,73 +1,177 @@
 import pandas as pd
+import polars as pl
+import pyarrow.parquet as pq
 from pathlib import Path
+from typing import Iterator, Optional
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 RAW_DIR = BASE_DIR / "data" / "raw"
 CLEAN_DIR = BASE_DIR / "data" / "cleaned"
 CLEAN_DIR.mkdir(parents=True, exist_ok=True)
 
-RAW_PATH = RAW_DIR / "nyc_311_full_year.parquet"
+# Directory of part files written by download_311_full_year.py
+RAW_PATH = RAW_DIR / "nyc_311_full_year"
 OUT_PATH = CLEAN_DIR / "nyc_311_full_year_cleaned.parquet"
 
+# Keep a subset of useful columns (only if they exist)
+COLS_TO_KEEP = [
+    "created_date",
+    "closed_date",
+    "complaint_type",
+    "descriptor",
+    "agency",
+    "borough",
+    "incident_zip",
+    "latitude",
+    "longitude",
+]
+
+# Rows per parquet row group in the cleaned output; also the default batch
+# size of iter_cleaned() so each batch decodes exactly one row group
+ROW_GROUP_SIZE = 256_000
+
+# The streaming engine's small default chunks make sink_parquet slow; larger
+# chunks amortise compression per write and fill row groups evenly
+pl.Config.set_streaming_chunk_size(100_000)
+
+# Compact dtypes for the derived columns
+FEATURE_DTYPES = {
+    "resolution_hours": pl.Float32,
+    "month": pl.Int8,
+    "hour": pl.Int8,
+    "weekday": pl.Int8,
+    "is_weekend": pl.Int8,
+}
+
+# Low-cardinality text columns. The cleaned parquet stores them as strings,
+# not Categorical: Polars writes Categorical with uint32 dictionary indices,
+# which pyarrow < 22 (the last line supporting Python 3.9) cannot hand to
+# pandas. Parquet still dictionary-encodes them on disk, but pd.read_parquet
+# returns plain strings rather than category dtype. Only clean_to_pandas()
+# makes them Categorical, in memory.
+CATEGORICAL_COLS = ["complaint_type", "descriptor", "agency", "borough", "incident_zip"]
+
+# Socrata floating timestamps, e.g. "2025-01-01T00:00:00.000"
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%.f"
+US_PER_HOUR = 3_600 * 1_000_000
+
+
+def parse_date(col: str, dtype: pl.DataType) -> pl.Expr:
+    """Parse a Socrata date column, skipping columns that are already datetimes."""
+    if dtype.is_temporal():
+        return pl.col(col).cast(pl.Datetime("us"))
+    return pl.col(col).str.to_datetime(DATE_FORMAT, strict=False)
+
+
+def cast_categoricals(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Cast the low-cardinality text columns present in `lf` to Categorical."""
+    names = lf.collect_schema().names()
+    return lf.with_columns(
+        pl.col(c).cast(pl.Categorical) for c in CATEGORICAL_COLS if c in names
+    )
+
+
+def clean_query(lf: pl.LazyFrame, categoricals: bool = False) -> pl.LazyFrame:
+    """
+    Apply the cleaning steps to a lazy frame of raw 311 rows, whether it
+    scans parquet or wraps pages straight from the API. Text columns stay
+    strings unless `categoricals` is set (see CATEGORICAL_COLS).
+    """
+    # For a parquet scan only the footer is read here, not the data pages
+    raw_schema = lf.collect_schema()
+    existing_cols = [c for c in COLS_TO_KEEP if c in raw_schema]
+
+    lf = (
+        lf
+        # Projection and null-date predicate are pushed into the parquet reader
+        .select(existing_cols)
+        .filter(
+            pl.col("created_date").is_not_null() & pl.col("closed_date").is_not_null()
+        )
+        # Parse dates
+        .with_columns(
+            parse_date("created_date", raw_schema["created_date"]),
+            parse_date("closed_date", raw_schema["closed_date"]),
+        )
+        # Drop dates that failed to parse
+        .drop_nulls(subset=["created_date", "closed_date"])
+        # Compute resolution time in hours, on the raw int64 microsecond
+        # timestamps rather than through a Duration column
+        .with_columns(
+            resolution_hours=(
+                pl.col("closed_date").dt.epoch("us")
+                - pl.col("created_date").dt.epoch("us")
+            )
+            / US_PER_HOUR
+        )
+        # Filter unrealistic values (negatives and > 30 days)
+        .filter(pl.col("resolution_hours").is_between(0, 24 * 30))
+        # Time features (Polars weekday is 1=Mon..7=Sun)
+        .with_columns(
+            month=pl.col("created_date").dt.month(),
+            hour=pl.col("created_date").dt.hour(),
+            weekday=pl.col("created_date").dt.weekday() - 1,  # 0=Mon
+            is_weekend=pl.col("created_date").dt.weekday() >= 6,
+        )
+        .cast(FEATURE_DTYPES)
+        # NYC coordinates need ~7 significant digits, which float32 holds
+        .with_columns(
+            pl.col(c).cast(pl.Float32, strict=False)
+            for c in ["latitude", "longitude"]
+            if c in existing_cols
+        )
+    )
+    return cast_categoricals(lf) if categoricals else lf
+
+
+def build_query(raw_path: Path = RAW_PATH, categoricals: bool = False) -> pl.LazyFrame:
+    """
+    Build the lazy cleaning query over the raw full-year parquet parts.
+    Nothing is read until the query is collected or sunk.
+    """
+    return clean_query(pl.scan_parquet(raw_path / "*.parquet"), categoricals)
+
+
+def clean_to_pandas(raw_path: Path = RAW_PATH) -> pd.DataFrame:
+    """
+    Run the cleaning query in memory and return a pandas DataFrame.
+    Columns stay Arrow-backed (pd.ArrowDtype) rather than numpy object, and
+    the low-cardinality text columns are dictionary-encoded.
+    """
+    df = build_query(raw_path, categoricals=True).collect()
+    return df.to_pandas(use_pyarrow_extension_array=True)
+
+
+def iter_cleaned(
+    batch_size: int = ROW_GROUP_SIZE, columns: Optional[list[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Iterate over the cleaned full-year file in pandas DataFrames of at most
+    `batch_size` rows, for analyses that do not fit the whole year in RAM.
+    Pass `columns` to read only a subset. Text columns come back
+    dictionary-encoded, straight from the parquet dictionary pages.
+    """
+    pf = pq.ParquetFile(OUT_PATH, read_dictionary=CATEGORICAL_COLS)
+    for batch in pf.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+
 
 def main():
     print(f"Loading full-year data from: {RAW_PATH}")
-    df = pd.read_parquet(RAW_PATH)
-
-    print(f"Original shape: {df.shape}")
-
-    # Keep a subset of useful columns (only if they exist)
-    cols_to_keep = [
-        "created_date",
-        "closed_date",
-        "complaint_type",
-        "descriptor",
-        "agency",
-        "borough",
-        "incident_zip",
-        "latitude",
-        "longitude",
-    ]
-    existing_cols = [c for c in cols_to_keep if c in df.columns]
-    df = df[existing_cols].copy()
-    print(f"After column filter: {df.shape}")
-
-    # Parse dates
-    df["created_date"] = pd.to_datetime(df["created_date"], errors="coerce")
-    df["closed_date"] = pd.to_datetime(df["closed_date"], errors="coerce")
-
-    # Drop invalid dates
-    df = df.dropna(subset=["created_date", "closed_date"])
-    print(f"After dropping invalid dates: {df.shape}")
-
-    # Compute resolution time in hours
-    df["resolution_hours"] = (
-        df["closed_date"] - df["created_date"]
-    ).dt.total_seconds() / 3600
-
-    # Filter unrealistic values (negatives and > 30 days)
-    df = df[(df["resolution_hours"] >= 0) & (df["resolution_hours"] <= 24 * 30)]
-    print(f"After filtering resolution_hours: {df.shape}")
-
-    # Time features
-    df["month"] = df["created_date"].dt.month
-    df["hour"] = df["created_date"].dt.hour
-    df["weekday"] = df["created_date"].dt.weekday  # 0=Mon
-    df["is_weekend"] = df["weekday"].isin([5, 6]).astype(int)
-
-    # Optional: downcast numeric columns to save space
-    num_cols = ["resolution_hours", "month", "hour", "weekday", "is_weekend"]
-    for col in num_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], downcast="float")
-
-    print("Final dtypes:")
-    print(df.dtypes)
+    lf = build_query(RAW_PATH)
+
+    print("Final schema:")
+    print(lf.collect_schema())
 
     print(f"Saving cleaned data to: {OUT_PATH}")
-    df.to_parquet(OUT_PATH, index=False)
+    lf.sink_parquet(
+        OUT_PATH,
+        compression="zstd",
+        compression_level=3,
+        row_group_size=ROW_GROUP_SIZE,
+    )
     print("Done.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
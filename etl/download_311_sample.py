@@ -1,7 +1,10 @@
 import requests
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 
+from socrata import SELECT_COLS, to_table
+
 
 # Base paths
 BASE_DIR = Path(__file__).resolve().parents[1]  # project root
@@ -9,7 +12,7 @@ RAW_DIR = BASE_DIR / "data" / "raw"
 RAW_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def fetch_311_sample(limit: int = 10000) -> pd.DataFrame:
+def fetch_311_sample(limit: int = 10000) -> pa.Table:
     """
     Fetch a sample of NYC 311 service requests from the Open Data API.
     Grabs the most recent 'limit' records.
@@ -17,6 +20,7 @@ def fetch_311_sample(limit: int = 10000) -> pd.DataFrame:
     url = "https://data.cityofnewyork.us/resource/erm2-nwe9.json"
 
     params = {
+        "$select": SELECT_COLS,
         "$limit": limit,
         "$order": "created_date DESC",
     }
@@ -27,16 +31,15 @@ def fetch_311_sample(limit: int = 10000) -> pd.DataFrame:
 
     data = resp.json()
     print(f"Received {len(data)} records.")
-    df = pd.DataFrame(data)
-    return df
+    return to_table(data)
 
 
 def main():
-    df = fetch_311_sample(limit=10000)
+    table = fetch_311_sample(limit=10000)
 
-    csv_path = RAW_DIR / "nyc_311_sample.csv"
-    df.to_csv(csv_path, index=False)
-    print(f"Saved raw sample to {csv_path}")
+    out_path = RAW_DIR / "nyc_311_sample.parquet"
+    pq.write_table(table, out_path, compression="zstd")
+    print(f"Saved raw sample to {out_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+"""
+ETL: Download the last 365 days of NYC 311 Service Requests and clean them
+in a single pass.
+
+This script:
+- Downloads date windows concurrently with keyset pagination (see socrata.py)
+- Runs each page through the same Polars cleaning query as
+  clean_311_full_year.py as soon as it arrives
+- Saves only the cleaned rows to data/cleaned/nyc_311_full_year_cleaned.parquet
+
+No raw copy is written, so the data crosses disk once. Use
+download_311_full_year.py followed by clean_311_full_year.py instead when
+the raw data is needed or the download has to be resumable.
+
+Usage (from project root):
+    python etl/download_clean_311_full_year.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from clean_311_full_year import OUT_PATH, ROW_GROUP_SIZE, clean_query
+from socrata import MAX_WORKERS, date_where, fetch_window, split_range
+
+
+def clean_window(window: tuple[datetime, datetime]) -> list[pl.DataFrame]:
+    """Download one date window and return its pages, each already cleaned."""
+    pages = []
+    for table in fetch_window(*window):
+        lf = clean_query(pl.from_arrow(table).lazy())
+        pages.append(lf.collect())
+        print(
+            f"  Kept {pages[-1].height} of {table.num_rows} rows from "
+            f"{window[0]:%Y-%m-%d} window"
+        )
+    return pages
+
+
+def main():
+    # Same 1-year window as download_311_full_year.py
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start_date = today - timedelta(days=365)
+
+    print(f"Downloading NYC 311 data where: {date_where(start_date, today)}")
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        windows = list(ex.map(clean_window, split_range(start_date, today)))
+
+    frames = [page for pages in windows for page in pages]
+    if not frames:
+        print("No data downloaded. Check API or filters.")
+        return
+
+    df = pl.concat(frames, how="vertical_relaxed")
+    print(f"Cleaned rows: {df.height:,}")
+
+    print(f"Saving cleaned data to: {OUT_PATH}")
+    df.lazy().sink_parquet(
+        OUT_PATH,
+        compression="zstd",
+        compression_level=3,
+        row_group_size=ROW_GROUP_SIZE,
+    )
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
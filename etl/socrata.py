@@ -0,0 +1,290 @@
+"""
+Shared helpers for paging through the NYC 311 Service Requests endpoint
+(NYC Open Data, erm2-nwe9).
+
+The requested date range is split into windows that are downloaded
+concurrently; within a window, pages are fetched with keyset pagination on
+(created_date, unique_key) so every page is an index seek rather than an
+ever-growing $offset skip. A small rate limiter keeps the request rate
+polite. Each page is written as its own parquet part file as it arrives, so
+an interrupted download resumes from the last page on disk. A finished part
+directory holds exactly one date range and reads back as one dataset with
+pd.read_parquet / pl.scan_parquet.
+"""
+
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# NYC 311 Service Requests endpoint (Open Data)
+BASE_URL = "https://data.cityofnewyork.us/resource/erm2-nwe9.json"
+
+# Optional: set an app token in your environment to avoid strict rate limiting
+APP_TOKEN = os.getenv("NYC_OPEN_DATA_APP_TOKEN", None)
+
+# Columns the cleaning step uses, plus unique_key for keyset pagination;
+# the endpoint has ~40 columns and we only need these
+SCHEMA = pa.schema(
+    [
+        ("unique_key", pa.string()),
+        ("created_date", pa.timestamp("us")),
+        ("closed_date", pa.timestamp("us")),
+        ("complaint_type", pa.string()),
+        ("descriptor", pa.string()),
+        ("agency", pa.string()),
+        ("borough", pa.string()),
+        ("incident_zip", pa.string()),
+        ("latitude", pa.float32()),
+        ("longitude", pa.float32()),
+    ]
+)
+SELECT_COLS = ",".join(SCHEMA.names)
+
+# Socrata returns every selected field as a JSON string and omits nulls
+_JSON_SCHEMA = pa.schema([(c, pa.string()) for c in SCHEMA.names])
+
+# Page size for each API call
+LIMIT = 50_000
+
+# Date windows downloaded concurrently, and the maximum request rate across
+# all of them
+MAX_WORKERS = 8
+WINDOWS = 24
+REQUESTS_PER_SECOND = 10
+
+# A window whose end is this recent may still gain rows (Socrata dates are
+# NYC local time, and requests can be logged late), so its last page is
+# re-fetched on every run instead of being treated as complete
+OPEN_WINDOW_GRACE = timedelta(days=1)
+
+# Written into a finished part directory to record the date range it holds;
+# pyarrow and pandas skip files starting with "_" when reading the directory
+RANGE_FILE = "_RANGE"
+
+
+class RateLimiter:
+    """
+    Allow at most `rate` requests to start in any one-second window.
+    Each slot is handed back one second after it was taken.
+    """
+
+    def __init__(self, rate: int):
+        self._slots = threading.Semaphore(rate)
+
+    def __enter__(self):
+        self._slots.acquire()
+        timer = threading.Timer(1.0, self._slots.release)
+        timer.daemon = True
+        timer.start()
+
+    def __exit__(self, *exc):
+        return False
+
+
+_rate_limiter = RateLimiter(REQUESTS_PER_SECOND)
+
+# One pooled keep-alive session shared by all worker threads; retries with
+# backoff on throttling and transient server errors
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1.0,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    ),
+)
+
+# Socrata floating timestamp literal, e.g. '2025-01-01T00:00:00'
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def _get(params: dict) -> list[dict]:
+    headers = {}
+    if APP_TOKEN:
+        headers["X-App-Token"] = APP_TOKEN
+
+    with _rate_limiter:
+        resp = SESSION.get(BASE_URL, params=params, headers=headers, timeout=60)
+    resp.raise_for_status()
+    # orjson decodes large page payloads noticeably faster than resp.json()
+    return orjson.loads(resp.content)
+
+
+def date_where(start: datetime, end: datetime) -> str:
+    """SoQL clause selecting rows with created_date in [start, end)."""
+    return (
+        f"created_date >= '{start:{TIMESTAMP_FORMAT}}' AND "
+        f"created_date < '{end:{TIMESTAMP_FORMAT}}'"
+    )
+
+
+def split_range(
+    start: datetime, end: datetime, n: int = WINDOWS
+) -> list[tuple[datetime, datetime]]:
+    """Split [start, end) into `n` contiguous, equally long windows."""
+    step = (end - start) / n
+    bounds = [start + step * i for i in range(n)] + [end]
+    # Truncate to whole seconds so adjacent windows share the exact literal
+    bounds = [b.replace(microsecond=0) for b in bounds]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def fetch_chunk(
+    where_clause: str,
+    after: Optional[tuple[str, str]] = None,
+    limit: int = LIMIT,
+) -> list[dict]:
+    """
+    Fetch the next chunk of rows after the (created_date, unique_key) key
+    `after`, or the first chunk if it is None. Returns a list of dicts (rows).
+    """
+    if after is not None:
+        last_date, last_key = after
+        # unique_key breaks ties between requests created in the same second
+        where_clause = (
+            f"{where_clause} AND (created_date > '{last_date}' OR "
+            f"(created_date = '{last_date}' AND unique_key > '{last_key}'))"
+        )
+
+    params = {
+        "$select": SELECT_COLS,
+        "$where": where_clause,
+        "$order": "created_date, unique_key",
+        "$limit": limit,
+    }
+    return _get(params)
+
+
+def to_table(rows: list[dict]) -> pa.Table:
+    """Convert a page of API rows to an Arrow table with the typed SCHEMA."""
+    return pa.Table.from_pylist(rows, schema=_JSON_SCHEMA).cast(SCHEMA)
+
+
+def _window_prefix(window_start: datetime) -> str:
+    return f"part_{window_start:%Y%m%dT%H%M%S}"
+
+
+def _part_path(parts_dir: Path, window_start: datetime, page: int) -> Path:
+    return parts_dir / f"{_window_prefix(window_start)}_{page:05d}.parquet"
+
+
+def _last_key(table: pa.Table) -> tuple[str, str]:
+    """Keyset cursor (created_date literal, unique_key) of a page's last row."""
+    last = table.select(["created_date", "unique_key"]).slice(table.num_rows - 1)
+    last = last.to_pylist()[0]
+    return last["created_date"].isoformat(timespec="milliseconds"), last["unique_key"]
+
+
+def fetch_window(
+    start: datetime, end: datetime, after: Optional[tuple[str, str]] = None
+) -> Iterator[pa.Table]:
+    """
+    Yield every non-empty page of rows created in [start, end) as a typed
+    Arrow table, starting after the keyset cursor `after` if given.
+    """
+    where_clause = date_where(start, end)
+
+    while True:
+        rows = fetch_chunk(where_clause, after, LIMIT)
+        if not rows:
+            return
+        table = to_table(rows)
+        yield table
+        if len(rows) < LIMIT:
+            return
+        after = _last_key(table)
+
+
+def _window_closed(end: datetime) -> bool:
+    """Whether a window ending at `end` can no longer gain rows."""
+    return end <= datetime.utcnow() - OPEN_WINDOW_GRACE
+
+
+def download_window(start: datetime, end: datetime, parts_dir: Path) -> None:
+    """
+    Download every row created in [start, end) as one part file per page,
+    skipping pages already on disk from an earlier run. For a window that
+    is still open, the last (short) page is fetched again to pick up rows
+    created since.
+    """
+    after = None
+    page = 0
+
+    # Skip existing full parts, resuming the cursor after the last one
+    while (path := _part_path(parts_dir, start, page)).exists():
+        keys = pq.read_table(path, columns=["created_date", "unique_key"])
+        if keys.num_rows < LIMIT:
+            if _window_closed(end):
+                return
+            break
+        after = _last_key(keys)
+        page += 1
+
+    for table in fetch_window(start, end, after):
+        path = _part_path(parts_dir, start, page)
+        # Write then rename so a crash never leaves a truncated part
+        tmp_path = path.with_suffix(".tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        tmp_path.replace(path)
+        print(f"  Wrote {table.num_rows} rows to {path.name}")
+        page += 1
+
+
+def write_pages(start: datetime, end: datetime, out_dir: Path) -> int:
+    """
+    Download every row created in [start, end) into `out_dir`, one parquet
+    part file per page. Windows are fetched concurrently and existing parts
+    are reused, so rerunning after a failure only fetches missing pages.
+
+    `out_dir` only ever holds one complete date range. A different range is
+    downloaded into a staging directory next to it, which replaces `out_dir`
+    once every window has finished. Returns the number of rows in `out_dir`.
+    """
+    range_name = f"{start:%Y%m%dT%H%M%S}_{end:%Y%m%dT%H%M%S}"
+    range_file = out_dir / RANGE_FILE
+
+    if range_file.exists() and range_file.read_text() == range_name:
+        # Same range as the finished dataset: resume and refresh in place
+        parts_dir = out_dir
+    else:
+        parts_dir = out_dir.with_name(f"{out_dir.name}.{range_name}.partial")
+    parts_dir.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        # list() re-raises the first failure from any window
+        list(ex.map(lambda w: download_window(*w, parts_dir), split_range(start, end)))
+
+    # Leftovers from an interrupted write
+    for path in parts_dir.glob("*.tmp"):
+        path.unlink()
+
+    if parts_dir != out_dir:
+        (parts_dir / RANGE_FILE).write_text(range_name)
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        parts_dir.rename(out_dir)
+
+    # Staging directories of failed runs over other date ranges
+    for path in out_dir.parent.glob(f"{out_dir.name}.*.partial"):
+        shutil.rmtree(path)
+
+    return sum(
+        pq.ParquetFile(path).metadata.num_rows
+        for path in out_dir.glob("part_*.parquet")
+    )